@@ -8,9 +8,9 @@ validation = validator.validate_names()
 
 print(validation)
 
-#> validated_type='typing.Union[typing.Callable[[], builtins.int], builtins.int]'
-# errors=[] pytype=typing.Union[typing.Callable[[], int], int] invalid_names=[]
-# type_map={'int': 'builtins', 'Callable': 'typing', 'Union': 'typing'}
+#> ValidationResult(validated_type='typing.Union[typing.Callable[[], builtins.int], builtins.int]',
+# errors=(), pytype=typing.Union[typing.Callable[[], int], int], invalid_names=(),
+# type_map={'Union': 'typing', 'Callable': 'typing', 'int': 'builtins'})
 
 print(validation.pytype)
 #> typing.Union[typing.Callable[[], int], int]
@@ -0,0 +1,84 @@
+import copy
+import dataclasses
+import pickle
+
+import pytest
+
+from validator import TypeValidator
+
+
+@pytest.mark.parametrize(
+    "annotation",
+    [
+        'Annotated[int, defaultdict(print)["x"]]',
+        'Annotated[int, defaultdict(typing.sys.modules["os"].getpid)[0]]',
+        "Annotated[int, defaultdict(exit)[0]]",
+        "Annotated[int, defaultdict(print)]",
+        'Annotated[int, Doc("x").documentation]',
+        'Annotated[int, print("x")]',
+        "typing.sys.modules",
+    ],
+)
+def test_rejects_unsafe_expressions(annotation):
+    result = TypeValidator(annotation).validate_names()
+
+    assert not result.is_valid
+    assert result.pytype is None
+
+
+@pytest.mark.parametrize(
+    "annotation",
+    [
+        'Annotated[int, Doc("x")]',
+        'Annotated[int, TypeVar("T", bound=int)]',
+        "tuple[*tuple[int, ...]]",
+    ],
+)
+def test_accepts_annotated_metadata_and_unpacking(annotation):
+    result = TypeValidator(annotation).validate_names()
+
+    assert result.is_valid
+    assert not result.errors
+
+
+def test_result_is_immutable_and_hashable():
+    result = TypeValidator.validated("Optional[int]")
+
+    with pytest.raises(TypeError):
+        result.type_map["Optional"] = "builtins"
+    assert isinstance(result.invalid_names, tuple)
+    assert hash(result) == hash(TypeValidator("Optional[int]").validate_names())
+
+
+def test_result_can_be_pickled_and_copied():
+    result = TypeValidator("list[int]").validate_names()
+
+    restored = pickle.loads(pickle.dumps(result))
+    assert restored == result
+    assert hash(restored) == hash(result)
+    assert copy.deepcopy(result) == result
+    assert dataclasses.asdict(result)["type_map"] == {"list": "builtins", "int": "builtins"}
+
+
+@pytest.mark.parametrize(
+    "annotation, invalid_names",
+    [
+        ("Foo.Bar", ("Foo.Bar",)),
+        ("typing.sys", ("typing.sys",)),
+        ("builtins.eval", ("builtins.eval",)),
+        ("typing.Nope[int]", ("typing.Nope",)),
+        ("len", ("len",)),
+    ],
+)
+def test_reports_invalid_qualified_names(annotation, invalid_names):
+    result = TypeValidator(annotation).validate_names()
+
+    assert result.invalid_names == invalid_names
+    assert not result.is_valid
+
+
+def test_accepts_qualified_names():
+    result = TypeValidator("typing.Optional[list[int]]").validate_names()
+
+    assert result.is_valid
+    assert result.validated_type == "typing.Optional[builtins.list[builtins.int]]"
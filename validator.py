@@ -1,15 +1,358 @@
+import ast
 import builtins
 import re
+import threading
 import typing
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import BuiltinFunctionType, CodeType, FunctionType, ModuleType
 
 import safelib
 import typing_extensions
-from pydantic import BaseModel
 
-BUILTIN_NAMESPACES = ("builtins", "typing", "typing_extensions")
+_IMPORTER = safelib.Import(
+    "typing", "typing_extensions", raises=False, search_builtins=True
+)
+_IMPORTER_LOCK = threading.Lock()
+
+_TOKEN_RE = re.compile(
+    r'''[bfr]*(?:""".*?"""|\'\'\'.*?\'\'\'|"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')|(?<!\w)(?<!\.)([a-zA-Z_][a-zA-Z0-9_]*)(?!\.)(?!\w)'''
+)
+
+_EVAL_NAMESPACE = {
+    "__builtins__": {},
+    "typing": typing,
+    "typing_extensions": typing_extensions,
+    "builtins": builtins,
+}
+
+_NAMESPACES = ("builtins", "typing", "typing_extensions")
+
+# Names bound to these can be resolved but never appear in a type annotation.
+_NON_ANNOTATION_TYPES = (ModuleType, FunctionType, BuiltinFunctionType)
+
+# Builtins take precedence over typing, matching the safelib search order.
+_FAST_PATH = {
+    **{
+        name: "typing"
+        for name in typing.__all__
+        if not isinstance(getattr(typing, name), _NON_ANNOTATION_TYPES)
+    },
+    **{
+        name: "builtins"
+        for name, value in vars(builtins).items()
+        if isinstance(value, type) and not name.startswith("_")
+    },
+}
+
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.Name,
+    ast.Attribute,
+    ast.Subscript,
+    ast.Tuple,
+    ast.List,
+    ast.Constant,
+    ast.Load,
+    ast.BinOp,
+    ast.BitOr,
+    ast.UnaryOp,
+    ast.USub,
+    ast.Starred,
+)
+
+_METADATA_ORIGINS = ("typing", "typing_extensions")
+
+
+@lru_cache(maxsize=512)
+def _resolve_name(name: str) -> tuple[bool, str | None]:
+    """
+    Resolves a name through the shared import context.
+
+    Args:
+        name (str): The name to resolve.
+
+    Modules and functions are not valid entities, as they can not be used as types.
+
+    Returns:
+        tuple[bool, str | None]: Whether the name is a valid entity and its import origin,
+        or None as the origin if the name could not be located.
+    """
+    with _IMPORTER_LOCK, _IMPORTER:
+        entity = _IMPORTER.get_entity(name)
+        if not safelib.valid(entity) or isinstance(entity, _NON_ANNOTATION_TYPES):
+            return False, None
+        entity_info = safelib.state.names.get(name)
+    if not entity_info:
+        return True, None
+
+    origin, _ = entity_info
+    return True, origin or ""
+
+
+@lru_cache(maxsize=512)
+def _resolve_qualified(name: str) -> bool:
+    """
+    Checks that a dotted name refers to an entity of one of the namespace modules.
+
+    Args:
+        name (str): The dotted name to resolve, such as "typing.List".
+
+    Returns:
+        bool: True if the root is a namespace module and every attribute is public and
+        resolves to something other than a module or function.
+    """
+    root, *attributes = name.split(".")
+    if root not in _NAMESPACES:
+        return False
+
+    entity = _EVAL_NAMESPACE[root]
+    for attribute in attributes:
+        if attribute.startswith("_"):
+            return False
+        entity = getattr(entity, attribute, None)
+        if entity is None or isinstance(entity, _NON_ANNOTATION_TYPES):
+            return False
+    return True
+
+
+def _lookup(node: ast.AST) -> typing.Any:
+    """
+    Statically resolves a dotted name against the evaluation namespace.
+
+    Args:
+        node (ast.AST): The name or attribute chain to resolve.
+
+    Returns:
+        Any: The resolved object, or None if the node is not a resolvable dotted name.
+    """
+    if isinstance(node, ast.Name):
+        return _EVAL_NAMESPACE.get(node.id)
+    if isinstance(node, ast.Attribute) and not node.attr.startswith("_"):
+        return getattr(_lookup(node.value), node.attr, None)
+    return None
+
+
+def _is_metadata_callee(node: ast.AST) -> bool:
+    """
+    Checks whether a call target is a public class defined by typing or typing_extensions.
+
+    Classes these modules only re-export, such as typing.defaultdict, are rejected.
+
+    Args:
+        node (ast.AST): The called expression.
+
+    Returns:
+        bool: True if the call may appear in Annotated metadata.
+    """
+    if not (
+        isinstance(node, ast.Attribute)
+        and isinstance(node.value, ast.Name)
+        and node.value.id in _METADATA_ORIGINS
+    ):
+        return False
+    callee = _lookup(node)
+    return isinstance(callee, type) and callee.__module__ in _METADATA_ORIGINS
+
+
+def _check_node(node: ast.AST, in_metadata: bool = False) -> None:
+    """
+    Recursively checks that an annotation tree only contains type expressions.
+
+    Calls are only accepted inside the metadata of an Annotated subscript, only to
+    classes defined by typing or typing_extensions, and their results can not be
+    subscripted or accessed further. Attribute chains can not pass through modules
+    other than the namespace they start from.
+
+    Args:
+        node (ast.AST): The node to check.
+        in_metadata (bool, optional): Whether the node is part of Annotated metadata.
+
+    Raises:
+        ValueError: If the node is not allowed in an annotation.
+    """
+    if isinstance(node, ast.Call):
+        if not (in_metadata and _is_metadata_callee(node.func)):
+            raise ValueError("unsupported expression in annotation: Call")
+    elif isinstance(node, ast.keyword):
+        if not in_metadata:
+            raise ValueError("unsupported expression in annotation: keyword")
+    elif not isinstance(node, _ALLOWED_NODES):
+        raise ValueError(f"unsupported expression in annotation: {type(node).__name__}")
+
+    if isinstance(node, ast.Attribute) and node.attr.startswith("_"):
+        raise ValueError(f"private attribute in annotation: {node.attr}")
+
+    if isinstance(node, (ast.Attribute, ast.Subscript)):
+        if isinstance(node.value, ast.Call):
+            raise ValueError("unsupported expression in annotation: access on a call result")
+        if not isinstance(node.value, ast.Name) and isinstance(_lookup(node.value), ModuleType):
+            raise ValueError("unsupported expression in annotation: access through a module")
+
+    if (
+        isinstance(node, ast.Subscript)
+        and isinstance(node.value, ast.Attribute)
+        and isinstance(node.value.value, ast.Name)
+        and node.value.value.id in _METADATA_ORIGINS
+        and node.value.attr == "Annotated"
+        and isinstance(node.slice, ast.Tuple)
+        and node.slice.elts
+    ):
+        _check_node(node.value, in_metadata)
+        origin, *metadata = node.slice.elts
+        _check_node(origin, in_metadata)
+        for element in metadata:
+            _check_node(element, True)
+        return
+
+    for child in ast.iter_child_nodes(node):
+        _check_node(child, in_metadata)
+
+
+@lru_cache(maxsize=1024)
+def _compile_type(source: str) -> CodeType:
+    """
+    Compiles an annotation expression, rejecting anything but type expressions.
+
+    Args:
+        source (str): The annotation expression to compile.
+
+    Raises:
+        ValueError: If the expression contains calls outside Annotated metadata,
+            private attributes or other constructs that can not appear in a type annotation.
+
+    Returns:
+        CodeType: The compiled expression.
+    """
+    tree = ast.parse(source, "<annotation>", mode="eval")
+    _check_node(tree)
+    return compile(tree, "<annotation>", "eval")
+
+
+def _classify(names: list[str]) -> tuple[dict[str, str], list[str]]:
+    """
+    Resolves the origin of each name and collects the names that are invalid.
+
+    Dotted names are only validated, since they are already qualified.
+
+    Args:
+        names (list[str]): The unique names to classify.
+
+    Returns:
+        tuple[dict[str, str], list[str]]: The mapping of names to their origin
+        and the list of invalid names.
+    """
+    type_map = {}
+    invalid_names = []
+    for name in names:
+        if "." in name:
+            if not _resolve_qualified(name):
+                invalid_names.append(name)
+            continue
+
+        origin = _FAST_PATH.get(name)
+        if origin is not None:
+            type_map[name] = origin
+            continue
+
+        valid, origin = _resolve_name(name)
+        if not valid:
+            invalid_names.append(name)
+
+        if origin is None:
+            continue
+
+        type_map[name] = origin
+    return type_map, invalid_names
+
+
+def _dotted_name(node: ast.AST) -> str | None:
+    """
+    Returns the dotted name of a name or attribute chain.
+
+    Args:
+        node (ast.AST): The node to convert.
+
+    Returns:
+        str | None: The dotted name, or None if the chain does not start from a name.
+    """
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = _dotted_name(node.value)
+        return f"{value}.{node.attr}" if value else None
+    return None
+
+
+def _iter_names(node: ast.AST) -> typing.Iterator[ast.Name | ast.Attribute]:
+    """
+    Yields the bare names and qualified attribute chains of an annotation tree.
+
+    Args:
+        node (ast.AST): The node to search.
+
+    Returns:
+        Iterator[ast.Name | ast.Attribute]: The name and attribute nodes found under the node.
+    """
+    if _dotted_name(node):
+        yield node
+    else:
+        for child in ast.iter_child_nodes(node):
+            yield from _iter_names(child)
+
+
+def _qualify(source: str, nodes: list[ast.Name], type_map: dict[str, str]) -> str:
+    """
+    Inserts the origin prefix before each name in a single pass over the source.
+
+    Args:
+        source (str): The annotation source the nodes were parsed from.
+        nodes (list[ast.Name]): The name nodes to qualify.
+        type_map (dict[str, str]): A mapping of names to their origin.
+
+    Returns:
+        str: The source with every name that has an origin qualified, otherwise unchanged.
+    """
+    # Node offsets are in UTF-8 bytes, so the splice is done on the encoded source.
+    encoded = source.encode()
+    line_starts = [0]
+    for line in encoded.splitlines(keepends=True):
+        line_starts.append(line_starts[-1] + len(line))
+
+    parts = []
+    position = 0
+    for node in sorted(nodes, key=lambda node: (node.lineno, node.col_offset)):
+        origin = type_map.get(node.id)
+        if not origin:
+            continue
+        offset = line_starts[node.lineno - 1] + node.col_offset
+        parts.append(encoded[position:offset])
+        parts.append(f"{origin}.".encode())
+        position = offset
+    parts.append(encoded[position:])
+    return b"".join(parts).decode()
+
+
+class _FrozenDict(dict):
+    """
+    A read-only, hashable dict that can still be pickled and copied.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
 
+    def __reduce__(self):
+        return type(self), (dict(self),)
 
-class ValidationResult(BaseModel):
+
+@dataclass(slots=True, frozen=True)
+class ValidationResult:
     """
     Represents the result of a validation operation.
     """
@@ -19,9 +362,9 @@ class ValidationResult(BaseModel):
     The validated annotation string with type annotations replaced.
     """
 
-    errors: list[Exception] = []
+    errors: tuple[Exception, ...] = ()
     """
-    A list of errors encountered during validation.
+    The errors encountered during validation.
     """
 
     pytype: typing.Any | None = None
@@ -29,19 +372,36 @@ class ValidationResult(BaseModel):
     The Python type corresponding to the validated annotation, if available.
     """
 
-    invalid_names: list[str] = []
+    invalid_names: tuple[str, ...] = ()
     """
-    A list of names that were found to be invalid during validation.
+    The names that were found to be invalid during validation.
     """
 
-    type_map: dict[str, str] = {}
+    type_map: typing.Mapping[str, str] = field(default_factory=dict)
     """
-    A mapping of type names with their import origin.
+    A read-only mapping of type names with their import origin.
     """
 
-    model_config = {
-        "arbitrary_types_allowed": True,
-    }
+    def __post_init__(self):
+        """
+        Freezes the containers so results can be safely shared and hashed.
+        """
+        object.__setattr__(self, "errors", tuple(self.errors))
+        object.__setattr__(self, "invalid_names", tuple(self.invalid_names))
+        object.__setattr__(self, "type_map", _FrozenDict(self.type_map))
+
+    def __hash__(self):
+        """
+        Hashes the result by its annotation, errors and resolved names.
+        """
+        return hash(
+            (
+                self.validated_type,
+                self.errors,
+                self.invalid_names,
+                self.type_map,
+            )
+        )
 
     def __bool__(self):
         """
@@ -82,21 +442,36 @@ class TypeValidator:
 
         self.annotation = annotation
         self.validated_type = annotation
-        self.pattern = re.compile(
-            r'''[bfr]*(?:""".*?"""|\'\'\'.*?\'\'\'|"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')|(?<!\w)(?<!\.)([a-zA-Z_][a-zA-Z0-9_]*)(?!\.)(?!\w)'''
-        )
+        self.pattern = _TOKEN_RE
+
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def validated(cls, annotation: str) -> ValidationResult:
+        """
+        Validates an annotation, reusing the result of earlier validations of the same string.
+
+        Args:
+            annotation (str): The type annotation string to validate.
+
+        Returns:
+            ValidationResult: The validation result, shared between calls.
+        """
+        result = cls(annotation).validate_names()
+        for error in result.errors:
+            error.with_traceback(None)
+        return result
 
     def only(self, iter):
         """
-        Filters out empty values from an iterable.
+        Filters out empty and duplicate values from an iterable, preserving order.
 
         Args:
             iterable (iterable): The iterable to filter.
 
         Returns:
-            list: A list of non-empty values.
+            list: A list of unique non-empty values.
         """
-        return list(set([x for x in iter if x]))
+        return list(dict.fromkeys(x for x in iter if x))
 
     def find_names(self, annotation: str = None) -> list[str]:
         """
@@ -112,22 +487,14 @@ class TypeValidator:
 
     def seperate_names(self) -> list[str]:
         """
-        Separates names into individual components if they contain multiple names.
+        Returns the unique names found in the annotation.
 
-        Args:
-            names (list[str]): A list of names to separate.
+        The tokenizer only yields bare identifiers, so no further splitting is needed.
 
         Returns:
-            list[str]: A list of separated names.
+            list[str]: A list of unique names.
         """
-        names = self.find_names()
-        seperated = []
-        for i, name in enumerate(names):
-            if len(sub_names := self.find_names(name)) > 1:
-                seperated.extend(sub_names)
-                names.pop(i)
-        seperated.extend(names)
-        return self.only(seperated)
+        return self.only(self.find_names())
 
     def validate_names(self):
         """
@@ -143,61 +510,48 @@ class TypeValidator:
             tuple: The transformed code/annotation and type information.
         """
         errors = []
-        type_map = {}
-        invalid_names = []
-        all_types = self.seperate_names()
-
-        with safelib.Import(
-            "typing", "typing_extensions", raises=False, search_builtins=True
-        ) as importer:
-            for type_ in all_types:
-                if "." in type_ and type_ in BUILTIN_NAMESPACES:
-                    continue
-                entity = importer.get_entity(type_)
-                if not safelib.valid(entity):
-                    invalid_names.insert(0, type_)
-
-                entity = safelib.get_entity_info(type_)
-                if not entity:
-                    continue
-
-                origin, _ = entity
-                if origin:
-                    entity_repr = f"{origin}.{type_}" if origin else type_
-                    type_map[type_] = origin
-                else:
-                    type_map[type_] = ""
-                    entity_repr = type_
-
-                self.validated_type = re.sub(
-                    rf"(?<!\.)(?<!\w){re.escape(type_)}\b", entity_repr, self.validated_type
-                )
-
-            if not invalid_names:
-                try:
-                    pytype = eval(
-                        self.validated_type,
-                        {
-                            "typing": typing,
-                            "typing_extensions": typing_extensions,
-                            "builtins": builtins,
-                        },
-                    )
-                except Exception as e:
-                    pytype = None
-                    errors.append(e)
-                return ValidationResult(
-                    validated_type=self.validated_type,
-                    pytype=pytype,
-                    errors=errors,
-                    type_map=type_map,
-                    invalid_names=invalid_names,
-                )
-            else:
-                return ValidationResult(
-                    validated_type=self.validated_type,
-                    pytype=None,
-                    type_map=type_map,
-                    errors=errors,
-                    invalid_names=invalid_names,
-                )
+        # Leading spaces and tabs are stripped the same way eval() does.
+        annotation = self.validated_type = self.annotation.lstrip(" \t")
+
+        try:
+            tree = ast.parse(annotation, "<annotation>", mode="eval")
+        except SyntaxError as e:
+            return ValidationResult(
+                validated_type=annotation,
+                pytype=None,
+                errors=[e],
+                type_map={},
+                invalid_names=[],
+            )
+
+        name_nodes = list(_iter_names(tree))
+        type_map, invalid_names = _classify(self.only(map(_dotted_name, name_nodes)))
+
+        if any(type_map.values()):
+            self.validated_type = _qualify(
+                annotation,
+                [node for node in name_nodes if isinstance(node, ast.Name)],
+                type_map,
+            )
+
+        if not invalid_names:
+            try:
+                pytype = eval(_compile_type(self.validated_type), _EVAL_NAMESPACE)
+            except Exception as e:
+                pytype = None
+                errors.append(e)
+            return ValidationResult(
+                validated_type=self.validated_type,
+                pytype=pytype,
+                errors=errors,
+                type_map=type_map,
+                invalid_names=invalid_names,
+            )
+        else:
+            return ValidationResult(
+                validated_type=self.validated_type,
+                pytype=None,
+                type_map=type_map,
+                errors=errors,
+                invalid_names=invalid_names,
+            )